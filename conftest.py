@@ -17,6 +17,10 @@ Configuration:
   test (technically a "template" db is created first, then that DB is cloned
   and the fresh clone is used for each test)
 
+* the suite can be distributed with pytest-xdist (``-n``), the template db
+  for each module is created once under a file lock in the shared basetemp
+  and reused by every worker, each worker gets its own server port
+
 * pytest.ini (at the root of the runbot repo or higher) with the following
   sections and keys
 
@@ -98,6 +102,10 @@ def pytest_addoption(parser):
     parser.addoption("--no-delete", action="store_true", help="Don't delete repo after a failed run")
     parser.addoption('--log-github', action='store_true')
     parser.addoption('--coverage', action='store_true')
+    parser.addoption(
+        '--rpc-stagings', action='store_true',
+        help="Also run the tests marked `rpc_stagings` (validating stagings "
+             "via RPC rather than statuses), skipped by default")
 
     parser.addoption(
         '--tunnel', action="store", default='',
@@ -124,6 +132,21 @@ def pytest_configure(config: pytest.Config) -> None:
         "markers",
         "defaultstatuses: use the statuses `default` rather than `ci/runbot,legal/cla`",
     )
+    config.addinivalue_line(
+        "markers",
+        "rpc_stagings: variant validating stagings via RPC, only run with `--rpc-stagings`",
+    )
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption('--rpc-stagings'):
+        return
+
+    selected, deselected = [], []
+    for item in items:
+        (deselected if item.get_closest_marker('rpc_stagings') else selected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
 
 def pytest_unconfigure(config):
     if not is_manager(config):
@@ -361,8 +384,10 @@ def port():
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         return s.getsockname()[1]
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def page(port):
+    # only depends on the (session-wide) port, connections dropped by a
+    # previous test's server are detected and re-established by the pool
     with requests.Session() as s:
         def get(url):
             r = s.get('http://localhost:{}{}'.format(port, url))
@@ -499,6 +524,9 @@ def server(request, db, port, module, addons_path, tmpdir):
         # TODO: way to override this with macOS?
         'XDG_DATA_HOME': str(tmpdir / 'share'),
         'XDG_CACHE_HOME': str(tmpdir.mkdir('cache')),
+        # test databases are thrown away after the test, so there's no need
+        # for the server to wait on the WAL flush at every commit
+        'PGOPTIONS': f"{os.environ.get('PGOPTIONS', '')} -c synchronous_commit=off",
     })
     os.close(w)
     # start the reader thread here so `_move` can read `p` without needing
@@ -948,8 +976,20 @@ class Repo:
 
     def post_status(self, ref, status, context='default', **kw):
         assert self.hook
-        assert status in ('error', 'failure', 'pending', 'success')
         commit = ref if isinstance(ref, Commit) else self.commit(ref)
+        self._post_status(commit, status, context, **kw)
+
+    def post_statuses(self, ref, *statuses):
+        """ Posts each ``(status, context)`` pair on ``ref``, only resolving
+        the ref once
+        """
+        assert self.hook
+        commit = ref if isinstance(ref, Commit) else self.commit(ref)
+        for status, context in statuses:
+            self._post_status(commit, status, context)
+
+    def _post_status(self, commit, status, context, **kw):
+        assert status in ('error', 'failure', 'pending', 'success')
         r = self._session.post('https://api.github.com/repos/{}/statuses/{}'.format(self.name, commit.id), json={
             'state': status,
             'context': context,
@@ -961,10 +1001,16 @@ class Repo:
         return any(c['sha'] == sha for c in self.log(of))
 
     def log(self, ref_or_sha):
+        """ Lazily iterates on the history of ``ref_or_sha``, a page is
+        only fetched once the previous one has been consumed so callers
+        which stop early (e.g. :meth:`is_ancestor`) don't walk the entire
+        history.
+        """
         for page in itertools.count(1):
             r = self._session.get(
                 'https://api.github.com/repos/{}/commits'.format(self.name),
-                params={'sha': ref_or_sha, 'page': page}
+                # max page size, most histories fit in a single page
+                params={'sha': ref_or_sha, 'page': page, 'per_page': 100}
             )
             assert 200 <= r.status_code < 300, r.text
             yield from r.json()
@@ -989,6 +1035,7 @@ class Repo:
         wait_for_hook()
         self.hook = False
     class Commit:
+        __slots__ = ['id', 'message', 'author', 'committer', 'tree', 'reset']
         def __init__(self, message, *, author=None, committer=None, tree, reset=False):
             self.id = None
             self.message = message
@@ -1237,11 +1284,15 @@ class Environment:
         self._db = db
         self._uid = None
         self._password = None
+        self._cron_ids = {}
+        self._model_fields = {}
         self._object = xmlrpc.client.ServerProxy(f'http://localhost:{port}/xmlrpc/2/object')
         self.login('admin', 'admin')
 
     def with_user(self, login, password):
         env = copy.copy(self)
+        # fields_get is filtered by the user's groups
+        env._model_fields = {}
         env.login(login, password)
         return env
 
@@ -1277,8 +1328,10 @@ class Environment:
             if xid is None:
                 continue
 
-            model, cron_id = self('ir.model.data', 'check_object_reference', *xid.split('.', 1))
-            assert model == 'ir.cron', "Expected {} to be a cron, got {}".format(xid, model)
+            if (cron_id := self._cron_ids.get(xid)) is None:
+                model, cron_id = self('ir.model.data', 'check_object_reference', *xid.split('.', 1))
+                assert model == 'ir.cron', "Expected {} to be a cron, got {}".format(xid, model)
+                self._cron_ids[xid] = cron_id
             cron_ids.append(cron_id)
         if cron_ids:
             self('ir.cron', 'write', cron_ids, {
@@ -1295,7 +1348,14 @@ class Model:
         object.__setattr__(self, '_name', model)
         object.__setattr__(self, '_ids', tuple(ids or ()))
 
-        object.__setattr__(self, '_fields', fields or self.env(self._name, 'fields_get', attributes=['type', 'relation']))
+        if not fields:
+            # a model's fields don't change during a test (for a given user),
+            # and every recordset (browse, search, relational field access)
+            # would otherwise fetch them again
+            fields = env._model_fields.get(model)
+            if fields is None:
+                fields = env._model_fields[model] = env(model, 'fields_get', attributes=['type', 'relation'])
+        object.__setattr__(self, '_fields', fields)
 
     @property
     def ids(self):
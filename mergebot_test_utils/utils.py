@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import contextlib
+import functools
 import itertools
 import re
 import time
@@ -16,6 +17,7 @@ closes {repo}#{number}
 REF_PATTERN = r'{target}-{source}-[a-zA-Z0-9_-]{{4}}-fw'
 
 class Commit:
+    __slots__ = ['id', 'message', 'author', 'committer', 'tree', 'reset']
     def __init__(self, message, *, author=None, committer=None, tree, reset=False):
         self.id = None
         self.message = message
@@ -27,11 +29,22 @@ class Commit:
 def validate_all(repos, refs, contexts=('ci/runbot', 'legal/cla')):
     """ Post a "success" status for each context on each ref of each repo
     """
-    for repo, branch, context in itertools.product(repos, refs, contexts):
-        repo.post_status(branch, 'success', context)
+    for repo, branch in itertools.product(repos, refs):
+        repo.post_statuses(branch, *(('success', context) for context in contexts))
 
+# (db, github login): partner ids, every test runs on a new database so no
+# need to ever clear it
+_partners = {}
 def get_partner(env, gh_login):
-    return env['res.partner'].search([('github_login', '=', gh_login)])
+    Partners = env['res.partner']
+    if ids := _partners.get((env._db, gh_login)):
+        return Partners.browse(ids)
+
+    partner = Partners.search([('github_login', '=', gh_login)])
+    # don't cache misses, the partner may well be created later on
+    if partner:
+        _partners[env._db, gh_login] = partner.ids
+    return partner
 
 def _simple_init(repo):
     """ Creates a very simple initialisation: a master branch with a commit,
@@ -65,8 +78,13 @@ class matches(str):
             return NotImplemented
         return self._r.search(text)
 
+# (db, repository, number): dashboard url, only depends on the PR's identity
+# so remains valid even if the PR record gets deleted and re-fetched
+_urls = {}
 def seen(env, pr, users):
-    url = to_pr(env, pr).url
+    key = (env._db, pr.repo.name, pr.number)
+    if (url := _urls.get(key)) is None:
+        url = _urls[key] = to_pr(env, pr).url
     return users['user'], f'[![Pull request status dashboard]({url}.png)]({url})'
 
 def make_basic(
@@ -177,11 +195,18 @@ def make_basic(
 
     return prod, other
 
+@functools.lru_cache(maxsize=16)
+def _parse_page(content: bytes):
+    # the dashboard is often re-fetched without having changed in-between
+    return html.fromstring(content)
+
 def pr_page(page, pr):
-    return html.fromstring(page(f'/{pr.repo.name}/pull/{pr.number}'))
+    return _parse_page(page(f'/{pr.repo.name}/pull/{pr.number}'))
 
 def to_pr(env, pr, *, attempts=5):
-    for _ in range(attempts):
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(1)
         pr_id = env['runbot_merge.pull_requests'].search([
             ('repository.name', '=', pr.repo.name),
             ('number', '=', pr.number),
@@ -189,16 +214,20 @@ def to_pr(env, pr, *, attempts=5):
         if pr_id:
             assert len(pr_id) == 1, f"Expected to find {pr.repo.name}#{pr.number}, got {pr_id}."
             return pr_id
-        time.sleep(1)
 
     raise TimeoutError(f"Unable to find {pr.repo.name}#{pr.number}")
 
+_pr_names = {}
 def part_of(label, pr_id, *, separator='\n\n'):
     """ Adds the "part-of" pseudo-header in the footer.
     """
+    # the display name of a PR never changes, but the reviewer might
+    key = (pr_id.env._db, pr_id.id)
+    if (name := _pr_names.get(key)) is None:
+        name = _pr_names[key] = pr_id.display_name
     return f"""\
 {label}{separator}\
-Part-of: {pr_id.display_name}
+Part-of: {name}
 Signed-off-by: {pr_id.reviewed_by.formatted_email}"""
 
 def ensure_one(records):
@@ -228,6 +257,9 @@ TYPE_MAPPING = {
 }
 def read_tracking_value(tv) -> tuple[str, typing.Any, typing.Any]:
     field_id = tv.field_id if 'field_id' in tv else tv.field
-    field_type = field_id.field_type if 'field_type' in field_id else field_id.ttype
-    t = TYPE_MAPPING.get(field_type) or field_type
-    return field_id.name, tv[f"old_value_{t}"], tv[f"new_value_{t}"]
+    type_field = 'field_type' if 'field_type' in field_id else 'ttype'
+    [field] = field_id.read(['name', type_field])
+    t = TYPE_MAPPING.get(field[type_field]) or field[type_field]
+    old, new = f"old_value_{t}", f"new_value_{t}"
+    [values] = tv.read([old, new])
+    return field['name'], values[old], values[new]
@@ -32,6 +32,8 @@ FILE_PATTERN = re.compile(r"""
 \+\+\+\x20(?P<prefix_b>b/)?(?P<file_to>\S+)(:?\s.*)?\n
 @@\x20-(\d+(,\d+)?)\x20\+(\d+(,\d+)?)\x20@@ # trailing garbage
 """, re.VERBOSE)
+SUBJECT_PREFIX = re.compile(r'^\[PATCH( \d+/\d+)?\] ')
+GIT_HEADERS = re.compile(r"^(git --diff .*|index .*)\n", re.MULTILINE)
 
 
 Authorship = Union[None, tuple[str, str], tuple[str, str, str]]
@@ -98,7 +100,7 @@ def parse_format_patch(p: Patch) -> ParseResult:
 
     name, email = parseaddr(m['from'])
     author = (name, email, m['date'])
-    msg = re.sub(r'^\[PATCH( \d+/\d+)?\] ', '', m['subject'])
+    msg = SUBJECT_PREFIX.sub('', m['subject'])
     body, _, rest = m.get_payload().partition('---\n')
     if body:
         msg += '\n\n' + body.replace('\r\n', '\n')
@@ -109,12 +111,7 @@ def parse_format_patch(p: Patch) -> ParseResult:
     # git (diff, show, format-patch) adds command and index headers to every
     # file header, which patch(1) chokes on, strip them... but maybe this should
     # extract the udiff sections instead?
-    patch = re.sub(
-        "^(git --diff .*|index .*)\n",
-        "",
-        patch,
-        flags=re.MULTILINE,
-    )
+    patch = GIT_HEADERS.sub("", patch)
     return ParseResult(kind="format-patch", author=author, committer=author, message=msg, patch=patch)
 
 
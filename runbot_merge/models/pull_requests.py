@@ -1539,7 +1539,13 @@ For your own safety I've ignored *everything in your entire comment*.
             if commit:
                 self.env.cr.commit()
 
-    def _build_message(self, message: Union['PullRequests', str], related_prs: 'PullRequests' = (), merge: bool = True) -> 'Message':
+    def _build_message(
+            self,
+            message: Union['PullRequests', str],
+            related_prs: 'PullRequests' = (),
+            merge: bool = True,
+            reviewers: Optional[List[str]] = None,
+    ) -> 'Message':
         # handle co-authored commits (https://help.github.com/articles/creating-a-commit-with-multiple-authors/)
         m = Message.from_message(message)
         if not is_mentioned(message, self):
@@ -1553,10 +1559,8 @@ For your own safety I've ignored *everything in your entire comment*.
             if not is_mentioned(message, r, full_reference=True):
                 m.headers.add('Related', r.display_name)
 
-        # ensures all reviewers in the review path are on the PR in order:
-        # original reviewer, then last conflict reviewer, then current PR
-        reviewers = (self | self.root_id | self.source_id)\
-            .mapped('reviewed_by.formatted_email')
+        if reviewers is None:
+            reviewers = self._message_reviewers()
 
         sobs = m.headers.getlist('signed-off-by')
         m.headers.remove('signed-off-by')
@@ -1571,6 +1575,12 @@ For your own safety I've ignored *everything in your entire comment*.
         )
         return m
 
+    def _message_reviewers(self) -> List[str]:
+        # ensures all reviewers in the review path are on the PR in order:
+        # original reviewer, then last conflict reviewer, then current PR
+        return (self | self.root_id | self.source_id)\
+            .mapped('reviewed_by.formatted_email')
+
     def unstage(self, reason, *args):
         """ If the PR is staged, cancel the staging. If the PR is split and
         waiting, remove it from the split (possibly delete the split entirely)
@@ -2,7 +2,6 @@ import base64
 import collections
 import contextlib
 import dataclasses
-import io
 import json
 import logging
 import os
@@ -16,7 +15,7 @@ from typing import Dict, Union, Optional, Literal, Callable, Iterator, Tuple, Li
 from werkzeug.datastructures import Headers
 
 from odoo import api, models, fields, Command
-from odoo.tools import OrderedSet, groupby
+from odoo.tools import groupby
 from .pull_requests import Branch, Stagings, PullRequests, Repository
 from .batch import Batch
 from .. import exceptions, utils, github, git
@@ -269,6 +268,7 @@ def stage_batches(branch: Branch, batches: Batch, staging_state: StagingState) -
     batch_limit = branch.project_id.batch_limit
     env = branch.env
     staged = env['runbot_merge.batch']
+    merge_failed = env.ref('runbot_merge.pr.merge.failed')
     for batch in batches:
         if len(staged) >= batch_limit:
             break
@@ -293,7 +293,7 @@ def stage_batches(branch: Branch, batches: Batch, staging_state: StagingState) -
                     reason = json.loads(str(reason))['message'].lower()
 
                 pr.error = True
-                env.ref('runbot_merge.pr.merge.failed')._send(
+                merge_failed._send(
                     repository=pr.repository,
                     pull_request=pr.number,
                     format_args={'pr': pr, 'reason': reason, 'exc': e},
@@ -393,6 +393,11 @@ def format_for_difflib(items: Iterator[Tuple[str, object]]) -> Iterator[str]:
         yield '\n'
 
 
+CLOSES_ISSUE = re.compile(r"""
+    \b(?:close|closes|closed|fix|fixes|fixed|resolve|resolves|resolved)
+    \s+\#([0-9]+)
+""", re.VERBOSE | re.IGNORECASE)
+
 Method = Literal['merge', 'rebase-merge', 'rebase-ff', 'squash']
 def stage(pr: PullRequests, info: StagingSlice, related_prs: PullRequests) -> Tuple[Method, str]:
     # nb: pr_commits is oldest to newest so pr.head is pr_commits[-1]
@@ -484,22 +489,17 @@ def stage(pr: PullRequests, info: StagingSlice, related_prs: PullRequests) -> Tu
     if pr_head_tree != pr_base_tree and merge_head_tree == merge_base_tree:
         raise exceptions.MergeError(pr, f'results in an empty tree when merged, might be the duplicate of a merged PR.')
 
-    finder = re.compile(r"""
-    \b(?:close|closes|closed|fix|fixes|fixed|resolve|resolves|resolved)
-    \s+\#([0-9]+)
-    """, re.VERBOSE | re.IGNORECASE)
-
     # TODO: maybe support closing issues in other repositories of the same project?
     info.tasks.update(
         int(m[1])
         for commit in pr_commits
-        for m in finder.finditer(commit['commit']['message'])
+        for m in CLOSES_ISSUE.finditer(commit['commit']['message'])
     )
     # Turns out if the PR is not targeted at the default branch, apparently
     # github doesn't parse its description and add links it to the closing
     # issues references, it's just "fuck off". So we need to handle that one by
     # hand too.
-    info.tasks.update(int(m[1]) for m in finder.finditer(pr.message))
+    info.tasks.update(int(m[1]) for m in CLOSES_ISSUE.finditer(pr.message))
     # So this ends up being *exclusively* for manually linked issues #feelsgoodman.
     owner, name = pr.repository.name.split('/')
     r = info.gh('post', '/graphql', json={
@@ -683,11 +683,14 @@ def add_self_references(
     """Adds a footer reference to ``self`` to all ``commits`` if they don't
     already refer to the PR.
     """
+    # the review chain is the same for every commit of the PR
+    reviewers = pr._message_reviewers()
     for c in (c['commit'] for c in commits):
         c['message'] = str(pr._build_message(
             c['message'],
             related_prs=related_prs,
             merge=merge and c['url'] == merge['commit']['url'],
+            reviewers=reviewers,
         ))
 
 BREAK = re.compile(r'''
@@ -709,6 +712,23 @@ SETEX_UNDERLINE = re.compile(r'''
     # 3+ -. Doesn't look like GH interprets `- - -` as a line so yay...
 ''', flags=re.VERBOSE)
 HEADER = re.compile('([A-Za-z-]+): (.*)')
+class Trailers(Headers):
+    """Headers normalising keys on insertion:
+    https://git.wiki.kernel.org/index.php/CommitMessageConventions seems to
+    mostly use capitalised names (rather than title-cased)
+    """
+    def __init__(self, defaults=None):
+        super().__init__()
+        # Headers bypasses `add` when initialised from a list or Headers
+        if defaults is not None:
+            self.extend(defaults)
+
+    def add(self, _key, _value, **kw):
+        super().add(_key.capitalize(), _value, **kw)
+
+    def set(self, _key, _value, **kw):
+        super().set(_key.capitalize(), _value, **kw)
+
 class Message:
     @classmethod
     def from_message(cls, msg: Union[PullRequests, str]) -> 'Message':
@@ -763,11 +783,11 @@ class Message:
         if body and body[-1]:
             body.append('')
         body.append(lines[0])
-        return cls('\n'.join(reversed(body)), Headers(reversed(headers)))
+        return cls('\n'.join(reversed(body)), Trailers(reversed(headers)))
 
     def __init__(self, body: str, headers: Optional[Headers] = None):
         self.body = body
-        self.headers = headers or Headers()
+        self.headers = headers if isinstance(headers, Trailers) else Trailers(headers)
 
     def __setattr__(self, name, value):
         # make sure stored body is always stripped
@@ -779,19 +799,19 @@ class Message:
         if not self.headers:
             return self.body.rstrip() + '\n'
 
-        with io.StringIO() as msg:
-            msg.write(self.body.rstrip())
-            msg.write('\n\n')
-            # https://git.wiki.kernel.org/index.php/CommitMessageConventions
-            # seems to mostly use capitalised names (rather than title-cased)
-            keys = list(OrderedSet(k.capitalize() for k in self.headers.keys()))
-            # c-a-b must be at the very end otherwise github doesn't see it
-            keys.sort(key=lambda k: k == 'Co-authored-by')
-            for k in keys:
-                for v in self.headers.getlist(k):
-                    msg.write(k)
-                    msg.write(': ')
-                    msg.write(v)
-                    msg.write('\n')
-
-            return msg.getvalue()
+        # group values by key in a single pass over the headers, keys are
+        # capitalised on insertion by Trailers
+        trailers: Dict[str, List[str]] = {}
+        for k, v in self.headers.items():
+            trailers.setdefault(k, []).append(v)
+        # c-a-b must be at the very end otherwise github doesn't see it
+        if coauthors := trailers.pop('Co-authored-by', None):
+            trailers['Co-authored-by'] = coauthors
+
+        parts = [self.body.rstrip(), '\n\n']
+        parts.extend(
+            f'{k}: {v}\n'
+            for k, vs in trailers.items()
+            for v in vs
+        )
+        return ''.join(parts)
@@ -4,6 +4,10 @@ import pytest
 def module():
     return 'runbot_merge'
 
+# NOTE: ``env`` is an RPC client to a server started on a fresh database for
+#       each test, and every call is committed server-side, so neither the
+#       project nor the repositories can outlive the test (there is no
+#       transaction to roll back to)
 @pytest.fixture
 def project(env, config):
     return env['runbot_merge.project'].create({
@@ -17,23 +21,47 @@ def project(env, config):
 
 
 @pytest.fixture
-def make_repo2(env, project, make_repo, users, setreviewers):
+def required_statuses():
+    """Statuses required on the repositories created by ``make_repos``, can
+    be overridden by test modules.
+    """
+    return 'default'
+
+
+@pytest.fixture
+def make_repos(env, project, make_repo, users, setreviewers, required_statuses):
     """Layer over ``make_repo`` which also:
 
-    - adds the new repo to ``project`` (with no group and the ``'default'`` status required)
-    - sets the standard reviewers on the repo
-    - and creates an event source for the repo
+    - adds the new repos to ``project`` (with no group and the ``required_statuses``)
+    - sets the standard reviewers on the repos
+    - and creates an event source for each repo
+
+    All the repos are registered at once, so use this over repeated calls to
+    ``make_repo2`` when a test needs multiple repositories.
     """
-    def mr(name):
-        r = make_repo(name)
-        rr = env['runbot_merge.repository'].create({
+    def mr(*names):
+        repos = [make_repo(name) for name in names]
+        rr = env['runbot_merge.repository'].create([{
             'project_id': project.id,
             'name': r.name,
             'group_id': False,
-            'required_statuses': 'default',
-        })
-        setreviewers(rr)
-        env['runbot_merge.events_sources'].create({'repository': r.name})
+            'required_statuses': required_statuses,
+        } for r in repos])
+        setreviewers(*rr)
+        env['runbot_merge.events_sources'].create([
+            {'repository': r.name}
+            for r in repos
+        ])
+        return repos
+    return mr
+
+
+@pytest.fixture
+def make_repo2(make_repos):
+    """Single-repository version of ``make_repos``
+    """
+    def mr(name):
+        [r] = make_repos(name)
         return r
     return mr
 
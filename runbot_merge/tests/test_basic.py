@@ -1,25 +1,28 @@
+import collections
 import datetime
 import itertools
 import json
 import textwrap
 import time
-from typing import Callable
 from unittest import mock
 
 import pytest
 import requests
 from lxml import html
 
-import odoo
 from utils import _simple_init, seen, matches, get_partner, Commit, pr_page, to_pr, part_of, ensure_one, read_tracking_value
 
 
-@pytest.fixture(autouse=True)
-def _configure_statuses(request, project, repo):
-    if 'defaultstatuses' not in request.keywords:
-        project.repo_ids.required_statuses = 'legal/cla,ci/runbot'
+@pytest.fixture
+def required_statuses(request):
+    if 'defaultstatuses' in request.keywords:
+        return 'default'
+    return 'legal/cla,ci/runbot'
 
-@pytest.fixture(autouse=True, params=["statuses", "rpc"])
+@pytest.fixture(autouse=True, params=[
+    "statuses",
+    pytest.param("rpc", marks=pytest.mark.rpc_stagings),
+])
 def stagings(request, env, project, repo):
     """Hook in support for validating stagings via RPC calls instead of CI
     webhooks. Transparent for the tests as long as they send statuses to
@@ -51,8 +54,24 @@ def stagings(request, env, project, repo):
             env['runbot_merge.stagings'].search([('target.name', '=', branchname)])\
                 .post_status(c.id, context, status, **kw)
 
-        with mock.patch.object(RepoType, "post_status", _post_status):
+        post_statuses = RepoType.post_statuses
+        def _post_statuses(repo, ref, *statuses):
+            if not ref.startswith(('staging.', 'heads/staging.')):
+                return post_statuses(repo, ref, *statuses)
+
+            c = repo.commit(ref)
+            branchname = ref.removeprefix('staging.').removeprefix('heads/staging.')
+            staging = env['runbot_merge.stagings'].search([('target.name', '=', branchname)])
+            for status, context in statuses:
+                staging.post_status(c.id, context, status)
+
+        RepoType.post_status = _post_status
+        RepoType.post_statuses = _post_statuses
+        try:
             yield
+        finally:
+            RepoType.post_status = post_status
+            RepoType.post_statuses = post_statuses
 
 def test_trivial_flow(env, repo, page, users, config):
     # create base branch
@@ -93,8 +112,7 @@ def test_trivial_flow(env, repo, page, users, config):
     }
 
     with repo:
-        repo.post_status(c2, 'success', 'legal/cla')
-        repo.post_status(c2, 'success', 'ci/runbot')
+        repo.post_statuses(c2, ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
     assert pr_id.state == 'validated'
 
@@ -127,11 +145,11 @@ def test_trivial_flow(env, repo, page, users, config):
     st = pr_id.staging_id
     env.run_crons()
 
-    assert {tuple(t) for t in st.statuses} == {
-        (repo.name, 'legal/cla', 'success', ''),
-        (repo.name, 'ci/runbot', 'success', 'http://foo.com/pog'),
+    assert sorted(map(tuple, st.statuses)) == [
         (repo.name, 'ci/lint', 'failure', 'http://ignored.com/whocares'),
-    }
+        (repo.name, 'ci/runbot', 'success', 'http://foo.com/pog'),
+        (repo.name, 'legal/cla', 'success', ''),
+    ]
 
     p = html.fromstring(page('/runbot_merge'))
     s = p.cssselect('.staging div.dropdown a')
@@ -204,19 +222,20 @@ class TestCommitMessage:
         """ verify 'closes ...' is correctly added in the commit message
         """
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('simple commit message', tree={'f': 'm2'}),
+            )
             repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, 'simple commit message', None, tree={'f': 'm2'})
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -228,19 +247,20 @@ class TestCommitMessage:
         """ verify do not duplicate 'closes' instruction
         """
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('simple commit message that closes #1', tree={'f': 'm2'}),
+            )
             repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, 'simple commit message that closes #1', None, tree={'f': 'm2'})
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -253,19 +273,20 @@ class TestCommitMessage:
         """ verify do not duplicate 'closes' instruction
         """
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('simple commit message that closes odoo/enterprise#1', tree={'f': 'm2'}),
+            )
             repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, 'simple commit message that closes odoo/enterprise#1', None, tree={'f': 'm2'})
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -278,19 +299,20 @@ class TestCommitMessage:
         """ verify do not match on a wrong number
         """
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('simple commit message that closes #11', tree={'f': 'm2'}),
+            )
             repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, 'simple commit message that closes #11', None, tree={'f': 'm2'})
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -308,20 +330,21 @@ class TestCommitMessage:
             'email': users['other'] + '@example.org'
         })
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('simple commit message', tree={'f': 'm2'}),
+            )
             repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, 'simple commit message', None, tree={'f': 'm2'})
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen delegate=%s' % users['other'], config["role_reviewer"]["token"])
             prx.post_comment('hansen r+', config['role_other']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -336,24 +359,25 @@ class TestCommitMessage:
         message
         """
         with repo:
-            c1 = repo.make_commit(None, 'first!', None, tree={'f': 'm1'})
-            repo.make_ref('heads/master', c1)
-            c2 = repo.make_commit(c1, '''simple commit message
+            c1, c2 = repo.make_commits(
+                None,
+                Commit('first!', tree={'f': 'm1'}),
+                Commit('''simple commit message
 
 
 Co-authored-by: Bob <bob@example.com>
 
-Fixes a thing''', None, tree={'f': 'm2'})
+Fixes a thing''', tree={'f': 'm2'}),
+            )
+            repo.make_ref('heads/master', c1)
 
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -417,15 +441,16 @@ class TestWebhookSecurity:
 def test_staging_ongoing(env, repo, config):
     with repo:
         # create base branch
-        m = repo.make_commit(None, 'initial', None, tree={'a': 'some content'})
-        repo.make_ref('heads/master', m)
+        [m] = repo.make_commits(None, Commit('initial', tree={'a': 'some content'}), ref='heads/master')
 
         # create PR
-        c0 = repo.make_commit(m, 'replace file contents', None, tree={'a': 'some other content'})
-        c1 = repo.make_commit(c0, 'add file', None, tree={'a': 'some other content', 'b': 'a second file'})
+        _, c1 = repo.make_commits(
+            m,
+            Commit('replace file contents', tree={'a': 'some other content'}),
+            Commit('add file', tree={'b': 'a second file'}),
+        )
         pr1 = repo.make_pr(title="gibberish", body="blahblah", target='master', head=c1)
-        repo.post_status(c1, 'success', 'legal/cla')
-        repo.post_status(c1, 'success', 'ci/runbot')
+        repo.post_statuses(c1, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         pr1.post_comment("hansen r+ rebase-merge", config['role_reviewer']['token'])
     env.run_crons()
     pr1 = to_pr(env, pr1)
@@ -433,37 +458,37 @@ def test_staging_ongoing(env, repo, config):
 
     with repo:
         # create second PR and make ready for staging
-        c2 = repo.make_commit(m, 'other', None, tree={'a': 'some content', 'c': 'ccc'})
-        c3 = repo.make_commit(c2, 'other', None, tree={'a': 'some content', 'c': 'ccc', 'd': 'ddd'})
+        _, c3 = repo.make_commits(
+            m,
+            Commit('other', tree={'c': 'ccc'}),
+            Commit('other', tree={'d': 'ddd'}),
+        )
         pr2 = repo.make_pr(title='gibberish', body='blahblah', target='master', head=c3)
-        repo.post_status(c3, 'success', 'legal/cla')
-        repo.post_status(c3, 'success', 'ci/runbot')
+        repo.post_statuses(c3, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         pr2.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
     p_2 = to_pr(env, pr2)
     assert p_2.state == 'ready', "PR2 should not have been staged since there is a pending staging for master"
 
     with repo:
-        repo.post_status('staging.master', 'success', 'ci/runbot')
-        repo.post_status('staging.master', 'success', 'legal/cla')
+        repo.post_statuses('staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
     env.run_crons()
     assert pr1.state == 'merged'
     assert p_2.staging_id
 
     with repo:
-        repo.post_status('staging.master', 'success', 'ci/runbot')
-        repo.post_status('staging.master', 'success', 'legal/cla')
+        repo.post_statuses('staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
     env.run_crons()
     assert p_2.state == 'merged'
 
-def test_staging_concurrent(env, repo, config):
+def test_staging_concurrent(env, project, repo, config):
     """ test staging to different targets, should be picked up together """
     with repo:
         m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
         repo.make_ref('heads/1.0', m)
         repo.make_ref('heads/2.0', m)
 
-    env['runbot_merge.project'].search([]).write({
+    project.write({
         'branch_ids': [(0, 0, {'name': '1.0'}), (0, 0, {'name': '2.0'})],
     })
 
@@ -471,15 +496,13 @@ def test_staging_concurrent(env, repo, config):
         c10 = repo.make_commit(m, 'AAA', None, tree={'m': 'm', 'a': 'a'})
         c11 = repo.make_commit(c10, 'BBB', None, tree={'m': 'm', 'a': 'a', 'b': 'b'})
         pr1 = repo.make_pr(title='t1', body='b1', target='1.0', head=c11)
-        repo.post_status(pr1.head, 'success', 'ci/runbot')
-        repo.post_status(pr1.head, 'success', 'legal/cla')
+        repo.post_statuses(pr1.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr1.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
 
         c20 = repo.make_commit(m, 'CCC', None, tree={'m': 'm', 'c': 'c'})
         c21 = repo.make_commit(c20, 'DDD', None, tree={'m': 'm', 'c': 'c', 'd': 'd'})
         pr2 = repo.make_pr(title='t2', body='b2', target='2.0', head=c21)
-        repo.post_status(pr2.head, 'success', 'ci/runbot')
-        repo.post_status(pr2.head, 'success', 'legal/cla')
+        repo.post_statuses(pr2.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr2.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
 
@@ -494,15 +517,20 @@ def test_staging_conflict_first(env, repo, users, config, page):
     marked as in error
     """
     with repo:
-        m1 = repo.make_commit(None, 'initial', None, tree={'f': 'm1'})
-        m2 = repo.make_commit(m1, 'second', None, tree={'f': 'm2'})
-        repo.make_ref('heads/master', m2)
+        m1, _ = repo.make_commits(
+            None,
+            Commit('initial', tree={'f': 'm1'}),
+            Commit('second', tree={'f': 'm2'}),
+            ref='heads/master',
+        )
 
-        c1 = repo.make_commit(m1, 'other second', None, tree={'f': 'c1'})
-        c2 = repo.make_commit(c1, 'third', None, tree={'f': 'c2'})
+        _, c2 = repo.make_commits(
+            m1,
+            Commit('other second', tree={'f': 'c1'}),
+            Commit('third', tree={'f': 'c2'}),
+        )
         pr = repo.make_pr(title='title', body='body', target='master', head=c2)
-        repo.post_status(pr.head, 'success', 'ci/runbot')
-        repo.post_status(pr.head, 'success', 'legal/cla')
+        repo.post_statuses(pr.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
 
@@ -531,15 +559,13 @@ def test_staging_conflict_second(env, repo, users, config):
     with repo:
         repo.make_commits(m, Commit('first pr', tree={'a': '2'}), ref='heads/pr0')
         pr0 = repo.make_pr(target='master', head='pr0')
-        repo.post_status(pr0.head, 'success', 'ci/runbot')
-        repo.post_status(pr0.head, 'success', 'legal/cla')
+        repo.post_statuses(pr0.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr0.post_comment('hansen r+', config['role_reviewer']['token'])
 
     with repo:
         repo.make_commits(m, Commit('second pr', tree={'a': '3'}), ref='heads/pr1')
         pr1 = repo.make_pr(target='master', head='pr1')
-        repo.post_status(pr1.head, 'success', 'ci/runbot')
-        repo.post_status(pr1.head, 'success', 'legal/cla')
+        repo.post_statuses(pr1.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr1.post_comment('hansen r+', config['role_reviewer']['token'])
     env.run_crons()
 
@@ -552,25 +578,22 @@ def test_staging_conflict_second(env, repo, users, config):
     # merge the staging, this should try to stage pr1, fail, and put it in error
     # as it now conflicts with the master proper
     with repo:
-        repo.post_status('staging.master', 'success', 'ci/runbot')
-        repo.post_status('staging.master', 'success', 'legal/cla')
+        repo.post_statuses('staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
     env.run_crons()
 
     assert pr1_id.state == 'error', "now pr1 should be in error"
 
 
+# fixed point in time, far enough in the past that anything set to it has long
+# timed out: no need to compute relative dates, whatever the server clock says
+PAST = '2020-01-01 00:00:00'
+
 @pytest.mark.defaultstatuses
-@pytest.mark.parametrize('update_op', [
-    pytest.param(
-        lambda _: {'timeout_limit': datetime.datetime.now().isoformat(" ", "seconds")},
-        id="set-timeout-limit",
-    ),
-    pytest.param(
-        lambda timeout: {'staged_at': (datetime.datetime.now() - datetime.timedelta(minutes=2*timeout)).isoformat(" ", "seconds")},
-        id="set-staged-at",
-    ),
+@pytest.mark.parametrize('update', [
+    pytest.param({'timeout_limit': PAST}, id="set-timeout-limit"),
+    pytest.param({'staged_at': PAST}, id="set-staged-at"),
 ])
-def test_staging_ci_timeout(env, repo, config, page, update_op: Callable[[int], dict]):
+def test_staging_ci_timeout(env, repo, config, page, update: dict):
     """If a staging timeouts (~ delay since staged greater than
     configured)... requeue?
     """
@@ -590,9 +613,8 @@ def test_staging_ci_timeout(env, repo, config, page, update_op: Callable[[int],
 
     pr_id = to_pr(env, pr)
     assert pr_id.staging_id
-    timeout = env['runbot_merge.project'].search([]).ci_timeout
 
-    pr_id.staging_id.write(update_op(timeout))
+    pr_id.staging_id.write(update)
     env.run_crons(None)
     assert pr_id.state == 'error', "timeout should fail the PR"
 
@@ -610,13 +632,12 @@ def test_timeout_bump_on_pending(env, repo, config):
         repo.make_ref('heads/master', m)
 
         prx = repo.make_pr(target='master', head=c)
-        repo.post_status(prx.head, 'success', 'ci/runbot')
-        repo.post_status(prx.head, 'success', 'legal/cla')
+        repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         prx.post_comment('hansen r+', config['role_reviewer']['token'])
     env.run_crons()
 
     st = env['runbot_merge.stagings'].search([])
-    old_timeout = odoo.fields.Datetime.to_string(datetime.datetime.now() - datetime.timedelta(days=15))
+    old_timeout = PAST
     st.timeout_limit = old_timeout
     with repo:
         repo.post_status('staging.master', 'pending', 'ci/runbot')
@@ -636,23 +657,27 @@ def test_staging_ci_failure_single(env, repo, users, config, page):
     """ on failure of single-PR staging, mark & notify failure
     """
     with repo:
-        m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
+        m, _, c2 = repo.make_commits(
+            None,
+            Commit('initial', tree={'m': 'm'}),
+            Commit('first', tree={'m': 'c1'}),
+            Commit('second', tree={'m': 'c2'}),
+        )
         repo.make_ref('heads/master', m)
-
-        c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
-        c2 = repo.make_commit(c1, 'second', None, tree={'m': 'c2'})
         pr = repo.make_pr(title='title', body='body', target='master', head=c2)
-        repo.post_status(pr.head, 'success', 'ci/runbot')
-        repo.post_status(pr.head, 'success', 'legal/cla')
+        repo.post_statuses(pr.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
     pr_id = to_pr(env, pr)
     assert pr_id.staging_id
 
     with repo:
-        repo.post_status('staging.master', 'failure', 'a/b')
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'failure', 'ci/runbot') # stable genius
+        repo.post_statuses(
+            'staging.master',
+            ('failure', 'a/b'),
+            ('success', 'legal/cla'),
+            ('failure', 'ci/runbot'), # stable genius
+        )
     env.run_crons()
     assert pr_id.state == 'error'
 
@@ -671,17 +696,19 @@ def test_staging_ci_failure_single(env, repo, users, config, page):
 def test_ff_failure(env, repo, config, page):
     """ target updated while the PR is being staged => redo staging """
     with repo:
-        m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
+        m, _, c2 = repo.make_commits(
+            None,
+            Commit('initial', tree={'m': 'm'}),
+            Commit('first', tree={'m': 'c1'}),
+            Commit('second', tree={'m': 'c2'}),
+        )
         repo.make_ref('heads/master', m)
-
-        c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
-        c2 = repo.make_commit(c1, 'second', None, tree={'m': 'c2'})
         prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-        repo.post_status(prx.head, 'success', 'legal/cla')
-        repo.post_status(prx.head, 'success', 'ci/runbot')
+        repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         prx.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
-    st = to_pr(env, prx).staging_id
+    pr_id = to_pr(env, prx)
+    st = pr_id.staging_id
     assert st
 
     with repo:
@@ -691,8 +718,7 @@ def test_ff_failure(env, repo, config, page):
     # report staging success & run cron to merge
     staging = repo.commit('heads/staging.master')
     with repo:
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
 
     assert st.reason == 'update is not a fast forward'
@@ -703,7 +729,7 @@ def test_ff_failure(env, repo, config, page):
     assert 'bg-gray-lighter' in prev.classes, "ff failure is ~ cancelling"
     assert 'fast forward failed (update is not a fast forward)' in prev.get('title')
 
-    assert to_pr(env, prx).staging_id, "merge should not have succeeded"
+    assert pr_id.staging_id, "merge should not have succeeded"
     assert repo.commit('heads/staging.master').id != staging.id,\
         "PR should be staged to a new commit"
 
@@ -713,28 +739,34 @@ def test_ff_failure_batch(env, repo, users, config):
         m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
         repo.make_ref('heads/master', m)
 
-        a1 = repo.make_commit(m, 'a1', None, tree={'m': 'm', 'a': '1'})
-        a2 = repo.make_commit(a1, 'a2', None, tree={'m': 'm', 'a': '2'})
-        repo.make_ref('heads/A', a2)
+        repo.make_commits(
+            m,
+            Commit('a1', tree={'a': '1'}),
+            Commit('a2', tree={'a': '2'}),
+            ref='heads/A'
+        )
         A = repo.make_pr(title='A', body=None, target='master', head='A')
-        repo.post_status(A.head, 'success', 'legal/cla')
-        repo.post_status(A.head, 'success', 'ci/runbot')
+        repo.post_statuses(A.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         A.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
 
-        b1 = repo.make_commit(m, 'b1', None, tree={'m': 'm', 'b': '1'})
-        b2 = repo.make_commit(b1, 'b2', None, tree={'m': 'm', 'b': '2'})
-        repo.make_ref('heads/B', b2)
+        repo.make_commits(
+            m,
+            Commit('b1', tree={'b': '1'}),
+            Commit('b2', tree={'b': '2'}),
+            ref='heads/B'
+        )
         B = repo.make_pr(title='B', body=None, target='master', head='B')
-        repo.post_status(B.head, 'success', 'legal/cla')
-        repo.post_status(B.head, 'success', 'ci/runbot')
+        repo.post_statuses(B.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         B.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
 
-        c1 = repo.make_commit(m, 'c1', None, tree={'m': 'm', 'c': '1'})
-        c2 = repo.make_commit(c1, 'c2', None, tree={'m': 'm', 'c': '2'})
-        repo.make_ref('heads/C', c2)
+        repo.make_commits(
+            m,
+            Commit('c1', tree={'c': '1'}),
+            Commit('c2', tree={'c': '2'}),
+            ref='heads/C'
+        )
         C = repo.make_pr(title='C', body=None, target='master', head='C')
-        repo.post_status(C.head, 'success', 'legal/cla')
-        repo.post_status(C.head, 'success', 'ci/runbot')
+        repo.post_statuses(C.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         C.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
     env.run_crons()
 
@@ -742,10 +774,10 @@ def test_ff_failure_batch(env, repo, users, config):
     pr_b = to_pr(env, B)
     pr_c = to_pr(env, C)
 
-    messages = [
+    messages = {
         c['commit']['message']
         for c in repo.log('heads/staging.master')
-    ]
+    }
     assert part_of('a2', pr_a) in messages
     assert part_of('b2', pr_b) in messages
     assert part_of('c2', pr_c) in messages
@@ -757,8 +789,7 @@ def test_ff_failure_batch(env, repo, users, config):
     old_staging = repo.commit('heads/staging.master')
     # confirm staging
     with repo:
-        repo.post_status('heads/staging.master', 'success', 'legal/cla')
-        repo.post_status('heads/staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('heads/staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
     new_staging = repo.commit('heads/staging.master')
 
@@ -766,8 +797,7 @@ def test_ff_failure_batch(env, repo, users, config):
 
     # confirm again
     with repo:
-        repo.post_status('heads/staging.master', 'success', 'legal/cla')
-        repo.post_status('heads/staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('heads/staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
     messages = {
         c['commit']['message']
@@ -791,7 +821,7 @@ class TestPREdition:
         """
         branch_1 = env['runbot_merge.branch'].create({
             'name': '1.0',
-            'project_id': env['runbot_merge.project'].search([]).id,
+            'project_id': project.id,
         })
 
         with repo:
@@ -800,11 +830,13 @@ class TestPREdition:
             repo.make_ref('heads/1.0', m)
             repo.make_ref('heads/2.0', m)
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
-            c2 = repo.make_commit(c1, 'second', None, tree={'m': 'c2'})
+            c1, c2 = repo.make_commits(
+                m,
+                Commit('first', tree={'m': 'c1'}),
+                Commit('second', tree={'m': 'c2'}),
+            )
             prx = repo.make_pr(title='title', body='body', target='master', head=c2)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen rebase-ff r+', config['role_reviewer']['token'])
         env.run_crons()
 
@@ -845,7 +877,7 @@ class TestPREdition:
         })
         branch_1 = env['runbot_merge.branch'].create({
             'name': '1.0',
-            'project_id': env['runbot_merge.project'].search([]).id,
+            'project_id': project.id,
         })
         master = env['runbot_merge.branch'].search([('name', '=', 'master')])
 
@@ -890,10 +922,10 @@ class TestPREdition:
         assert pr.squash
 
     @pytest.mark.xfail(reason="github doesn't allow retargeting closed PRs", strict=True)
-    def test_retarget_closed(self, env, repo):
+    def test_retarget_closed(self, env, project, repo):
         branch_1 = env['runbot_merge.branch'].create({
             'name': '1.0',
-            'project_id': env['runbot_merge.project'].search([]).id,
+            'project_id': project.id,
         })
 
         with repo:
@@ -921,8 +953,7 @@ def test_close_staged(env, repo, config, page):
 
         c = repo.make_commit(m, 'fist', None, tree={'m': 'c1'})
         prx = repo.make_pr(title='title', body='body', target='master', head=c)
-        repo.post_status(prx.head, 'success', 'legal/cla')
-        repo.post_status(prx.head, 'success', 'ci/runbot')
+        repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         prx.post_comment('hansen r+', config['role_reviewer']['token'])
     pr = to_pr(env, prx)
     env.run_crons()
@@ -935,7 +966,7 @@ def test_close_staged(env, repo, config, page):
     env.run_crons()
 
     assert not pr.staging_id
-    assert not env['runbot_merge.stagings'].search([])
+    assert not env['runbot_merge.stagings'].search_count([])
     assert pr.state == 'closed'
     assert pr_page(page, prx).cssselect('.alert-light')
     assert not pr.reviewed_by
@@ -953,26 +984,24 @@ def test_close_staged(env, repo, config, page):
 
 def test_forward_port(env, repo, config):
     with repo:
-        m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-        repo.make_ref('heads/master', m)
+        [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref='heads/master')
 
-        head = m
-        for i in range(110):
-            head = repo.make_commit(head, 'c_%03d' % i, None, tree={'m': 'm', 'f': str(i)})
+        *_, head = repo.make_commits(m, *(
+            Commit('c_%03d' % i, tree={'f': str(i)})
+            for i in range(110)
+        ))
     # not sure why we wanted to wait here
 
     with repo:
         pr = repo.make_pr(title='PR', body=None, target='master', head=head)
-        repo.post_status(pr.head, 'success', 'legal/cla')
-        repo.post_status(pr.head, 'success', 'ci/runbot')
+        repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         pr.post_comment('hansen r+ merge', config['role_reviewer']['token'])
     env.run_crons()
 
     st = repo.commit('staging.master')
 
     with repo:
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
 
     h = repo.commit('master')
@@ -1010,15 +1039,13 @@ def test_rebase_failure(env, repo, users, config):
         commit_a = repo.make_commit(m, 'A', None, tree={'m': 'm', 'a': 'a'})
         repo.make_ref('heads/a', commit_a)
         pr_a = repo.make_pr(title='A', body=None, target='master', head='a')
-        repo.post_status(pr_a.head, 'success', 'ci/runbot')
-        repo.post_status(pr_a.head, 'success', 'legal/cla')
+        repo.post_statuses(pr_a.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr_a.post_comment('hansen r+', config['role_reviewer']['token'])
 
         commit_b = repo.make_commit(m, 'B', None, tree={'m': 'm', 'b': 'b'})
         repo.make_ref('heads/b', commit_b)
         pr_b = repo.make_pr(title='B', body=None, target='master', head='b')
-        repo.post_status(pr_b.head, 'success', 'ci/runbot')
-        repo.post_status(pr_b.head, 'success', 'legal/cla')
+        repo.post_statuses(pr_b.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         pr_b.post_comment('hansen r+', config['role_reviewer']['token'])
 
     from odoo.addons.runbot_merge.github import GH
@@ -1064,14 +1091,12 @@ def test_reopen_merged_pr(env, repo, config, users):
             ref='heads/abranch'
         )
         prx = repo.make_pr(target='master', head='abranch')
-        repo.post_status(c, 'success', 'legal/cla')
-        repo.post_status(c, 'success', 'ci/runbot')
+        repo.post_statuses(c, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         prx.post_comment('hansen r+', config['role_reviewer']['token'])
     env.run_crons()
 
     with repo:
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
     env.run_crons()
     pr = to_pr(env, prx)
     assert prx.state == 'closed'
@@ -1152,15 +1177,13 @@ class TestRetry:
     @pytest.mark.xfail(reason="This may not be a good idea as it could lead to tons of rebuild spam")
     def test_auto_retry_push(self, env, repo, config):
         prx = _simple_init(repo)
-        repo.post_status(prx.head, 'success', 'ci/runbot')
-        repo.post_status(prx.head, 'success', 'legal/cla')
+        repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
         assert to_pr(env, prx).staging_id
 
         staging_head = repo.commit('heads/staging.master')
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'failure', 'ci/runbot')
+        repo.post_statuses('staging.master', ('success', 'legal/cla'), ('failure', 'ci/runbot'))
         env.run_crons()
         pr = to_pr(env, prx)
         assert pr.state == 'error'
@@ -1169,15 +1192,13 @@ class TestRetry:
         assert pr.state == 'approved'
         env['runbot_merge.project']._check_progress()
         assert pr.state == 'approved'
-        repo.post_status(prx.head, 'success', 'ci/runbot')
-        repo.post_status(prx.head, 'success', 'legal/cla')
+        repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
         assert pr.state == 'ready'
 
         staging_head2 = repo.commit('heads/staging.master')
         assert staging_head2 != staging_head
-        repo.post_status('staging.master', 'success', 'legal/cla')
-        repo.post_status('staging.master', 'success', 'ci/runbot')
+        repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
         assert pr.state == 'merged'
 
@@ -1188,8 +1209,7 @@ class TestRetry:
         """
         with repo:
             pr = _simple_init(repo)
-            repo.post_status(pr.head, 'success', 'ci/runbot')
-            repo.post_status(pr.head, 'success', 'legal/cla')
+            repo.post_statuses(pr.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             pr.post_comment(f'hansen r+ delegate={users["other"]} rebase-merge',
                             config["role_reviewer"]['token'])
         env.run_crons()
@@ -1198,8 +1218,7 @@ class TestRetry:
 
         staging_head = repo.commit('heads/staging.master')
         with repo:
-            repo.post_status('staging.master', 'success', 'legal/cla')
-            repo.post_status('staging.master', 'failure', 'ci/runbot')
+            repo.post_statuses('staging.master', ('success', 'legal/cla'), ('failure', 'ci/runbot'))
         env.run_crons()
         assert pr_id.state == 'error'
 
@@ -1227,8 +1246,7 @@ class TestRetry:
         staging_head2 = repo.commit('heads/staging.master')
         assert staging_head2 != staging_head
         with repo:
-            repo.post_status('staging.master', 'success', 'legal/cla')
-            repo.post_status('staging.master', 'success', 'ci/runbot')
+            repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
         assert pr_id.state == 'merged'
 
@@ -1238,8 +1256,7 @@ class TestRetry:
         """
         with repo:
             pr = _simple_init(repo)
-            repo.post_status(pr.head, 'success', 'ci/runbot')
-            repo.post_status(pr.head, 'success', 'legal/cla')
+            repo.post_statuses(pr.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
             pr.post_comment('hansen r+ delegate=%s rebase-merge' % users['other'],
                              config["role_reviewer"]['token'])
         env.run_crons()
@@ -1325,19 +1342,22 @@ class TestMergeMethod:
         """ If single commit, default to rebase & FF
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert to_pr(env, prx).squash
+        pr = to_pr(env, prx)
+        assert pr.squash
 
         env.run_crons()
-        assert to_pr(env, prx).staging_id
+        assert pr.staging_id
 
         staging = repo.commit('heads/staging.master')
         assert not repo.is_ancestor(prx.head, of=staging.id),\
@@ -1349,10 +1369,8 @@ class TestMergeMethod:
             "dummy commit aside, the previous master's tip should be the sole parent of the staging commit"
 
         with repo:
-            repo.post_status('staging.master', 'success', 'legal/cla')
-            repo.post_status('staging.master', 'success', 'ci/runbot')
+            repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
-        pr = to_pr(env, prx)
         assert pr.state == 'merged'
         assert prx.state == 'closed'
         assert json.loads(pr.commits_map) == {
@@ -1373,8 +1391,7 @@ class TestMergeMethod:
 
             [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             pr = repo.make_pr(target='master', head=c1)
-            repo.post_status(pr.head, 'success', 'legal/cla')
-            repo.post_status(pr.head, 'success', 'ci/runbot')
+            repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             pr.post_comment('hansen delegate+', config['role_reviewer']['token'])
             pr.post_comment('hansen merge', config['role_user']['token'])
         env.run_crons()
@@ -1388,9 +1405,12 @@ class TestMergeMethod:
         should be unflagged as squash
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
@@ -1407,9 +1427,12 @@ class TestMergeMethod:
         re-flagged as squash
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             c2 = repo.make_commit(c1, 'second2', None, tree={'m': 'c2'})
@@ -1447,8 +1470,7 @@ class TestMergeMethod:
                 Commit('B1', tree={'b': '1'}),
             )
             prx = repo.make_pr(title='title', body='body', target='master', head=b1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
@@ -1480,8 +1502,7 @@ commits, I need to know how to merge it:
             prx = repo.make_pr(title='title', body='body', target='master', head=b1)
         pr = to_pr(env, prx)
         with repo:
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
 
             prx.post_comment('hansen rebase-merge', config['role_reviewer']['token'])
         assert pr.merge_method == 'rebase-merge'
@@ -1549,8 +1570,7 @@ commits, I need to know how to merge it:
             b0 = repo.make_commit(m1, 'B0', author=author0, committer=committer, tree={'m': '1', 'b': '0'})
             b1 = repo.make_commit(b0, 'B1', author=author1, committer=committer, tree={'m': '1', 'b': '1'})
             prx = repo.make_pr(title='title', body='body', target='master', head=b1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ rebase-merge', config['role_reviewer']['token'])
         env.run_crons()
 
@@ -1582,8 +1602,7 @@ commits, I need to know how to merge it:
         assert pr_id.staging_id, "PR should immediately be re-stageable"
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
+            repo.post_statuses('heads/staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
 
         pr = to_pr(env, prx)
@@ -1644,8 +1663,7 @@ commits, I need to know how to merge it:
             )
 
             prx = repo.make_pr(title='title', body='body', target='master', head=b1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ rebase-ff', config['role_reviewer']['token'])
         env.run_crons()
 
@@ -1660,8 +1678,7 @@ commits, I need to know how to merge it:
         assert staging == nb1
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
+            repo.post_statuses('heads/staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
 
         pr = to_pr(env, prx)
@@ -1724,14 +1741,12 @@ commits, I need to know how to merge it:
         env.run_crons(None)
 
         with repo:
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -1763,14 +1778,12 @@ commits, I need to know how to merge it:
         env.run_crons(None)
 
         with repo:
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -1800,14 +1813,12 @@ commits, I need to know how to merge it:
             repo.make_commits(root, Commit('C', tree={'a': 'b'}), ref='heads/change')
             pr = repo.make_pr(title="title", body=f'first\n{separator}\nsecond',
                               target='master', head='change')
-            repo.post_status(pr.head, 'success', 'legal/cla')
-            repo.post_status(pr.head, 'success', 'ci/runbot')
+            repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             pr.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         head = repo.commit('heads/master')
@@ -1840,32 +1851,22 @@ This is more text
 removed
 """,
                               target='master', head='change')
-            repo.post_status(pr.head, 'success', 'legal/cla')
-            repo.post_status(pr.head, 'success', 'ci/runbot')
+            repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             pr.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         head = repo.commit('heads/master')
-        assert head.message == textwrap.dedent(f"""\
-        title
-
-        Title
-        ---
-        This is some text
-
-        Title 2
-        -------
-        This is more text
-
-        closes {repo.name}#{pr.number}
-
-        Signed-off-by: {reviewer}
-        """).strip(), "should not break the SETEX titles"
+        assert head.message == (
+            "title\n\n"
+            "Title\n---\nThis is some text\n\n"
+            "Title 2\n-------\nThis is more text\n\n"
+            f"closes {repo.name}#{pr.number}\n\n"
+            f"Signed-off-by: {reviewer}"
+        ), "should not break the SETEX titles"
 
     def test_rebase_no_edit(self, repo, env, users, config):
         """ Only the merge messages should be de-breaked
@@ -1877,28 +1878,21 @@ removed
             repo.make_commits(root, Commit('Commit\n\nfirst\n***\nsecond', tree={'a': 'b'}), ref='heads/change')
             pr = repo.make_pr(title="PR", body='first\n***\nsecond',
                               target='master', head='change')
-            repo.post_status(pr.head, 'success', 'legal/cla')
-            repo.post_status(pr.head, 'success', 'ci/runbot')
+            repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             pr.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         head = repo.commit('heads/master')
-        assert head.message == textwrap.dedent(f"""\
-        Commit
-
-        first
-        ***
-        second
-
-        closes {repo.name}#{pr.number}
-
-        Signed-off-by: {reviewer}
-        """).strip(), "squashed / rebased messages should not be stripped"
+        assert head.message == (
+            "Commit\n\n"
+            "first\n***\nsecond\n\n"
+            f"closes {repo.name}#{pr.number}\n\n"
+            f"Signed-off-by: {reviewer}"
+        ), "squashed / rebased messages should not be stripped"
 
     def test_title_no_edit(self, repo, env, users, config):
         """The first line of a commit message should not be taken in account for
@@ -1914,8 +1908,7 @@ removed
                 ref='heads/change')
 
             pr = repo.make_pr(target='master', head='change')
-            repo.post_status(pr.head, 'success', 'legal/cla')
-            repo.post_status(pr.head, 'success', 'ci/runbot')
+            repo.post_statuses(pr.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             pr.post_comment('hansen rebase-ff r+', config['role_reviewer']['token'])
         env.run_crons()
 
@@ -1962,14 +1955,12 @@ Signed-off-by: {reviewer}"""
         env.run_crons()
 
         with repo:
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -2005,14 +1996,12 @@ Signed-off-by: {reviewer}"""
         env.run_crons()
 
         with repo:
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+ merge', config['role_reviewer']['token'])
         env.run_crons()
 
         with repo:
-            repo.post_status('heads/staging.master', 'success', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         master = repo.commit('heads/master')
@@ -2028,10 +2017,8 @@ Signed-off-by: {reviewer}"""
         )
         assert log_to_node(repo.log('heads/master')), expected
 
-    def test_squash_merge(self, repo, env, config, users):
-        other_user = requests.get('https://api.github.com/user', headers={
-            'Authorization': 'token %s' % config['role_other']['token'],
-        }).json()
+    def test_squash_merge(self, repo, env, config, users, rolemap):
+        other_user = rolemap['other']
         other_user = {
             'name': other_user['name'] or other_user['login'],
             # FIXME: not guaranteed
@@ -2047,8 +2034,7 @@ Signed-off-by: {reviewer}"""
                 ref='heads/other'
             )
             pr1 = repo.make_pr(title='first pr', target='master', head='other')
-            repo.post_status('other', 'success', 'legal/cla')
-            repo.post_status('other', 'success', 'ci/runbot')
+            repo.post_statuses('other', ('success', 'legal/cla'), ('success', 'ci/runbot'))
 
             pr_2_commits = repo.make_commits(
                 'master',
@@ -2060,8 +2046,7 @@ Signed-off-by: {reviewer}"""
             assert c1.author['name'] != c2.author['name']
             assert c1.committer['name'] != c2.committer['name']
             pr2 = repo.make_pr(title='second pr', target='master', head='other2')
-            repo.post_status('other2', 'success', 'legal/cla')
-            repo.post_status('other2', 'success', 'ci/runbot')
+            repo.post_statuses('other2', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
 
         with repo: # comments sequencing
@@ -2070,8 +2055,7 @@ Signed-off-by: {reviewer}"""
         env.run_crons()
 
         with repo:
-            repo.post_status('staging.master', 'success', 'legal/cla')
-            repo.post_status('staging.master', 'success', 'ci/runbot')
+            repo.post_statuses('staging.master', ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
 
         # PR 1 should have merged properly, the PR message should be the
@@ -2111,7 +2095,7 @@ Signed-off-by: {get_partner(env, users["reviewer"]).formatted_email}\
 
         # FIXME: should probably get the token from the project to be sure it's
         #        the bot user
-        current_user = repo._session.get('https://api.github.com/user').json()
+        current_user = rolemap['user']
         current_user = {
             'name': current_user['name'] or current_user['login'],
             # FIXME: not guaranteed
@@ -2238,7 +2222,7 @@ class TestPRUpdate:
         assert pr.head == c2
         assert pr.state == 'opened'
         assert not pr.staging_id
-        assert not env['runbot_merge.stagings'].search([])
+        assert not env['runbot_merge.stagings'].search_count([])
 
     @pytest.mark.defaultstatuses
     def test_split(self, env, repo, config):
@@ -2306,7 +2290,7 @@ class TestPRUpdate:
         assert pr.head == c2
         assert pr.state == 'opened'
 
-    def test_unknown_pr(self, env, repo):
+    def test_unknown_pr(self, env, project, repo):
         with repo:
             [m, c] = repo.make_commits(
                 None,
@@ -2316,9 +2300,9 @@ class TestPRUpdate:
             repo.make_ref('heads/1.0', m)
             prx = repo.make_pr(title='title', body='body', target='1.0', head=c)
         with pytest.raises(TimeoutError):
-            to_pr(env, prx)
+            to_pr(env, prx, attempts=1)
 
-        env['runbot_merge.project'].search([]).write({
+        project.write({
             'branch_ids': [(0, 0, {'name': '1.0'})]
         })
 
@@ -2327,7 +2311,7 @@ class TestPRUpdate:
             repo.update_ref(prx.ref, c2, force=True)
 
         with pytest.raises(TimeoutError):
-            to_pr(env, prx)
+            to_pr(env, prx, attempts=1)
 
     @pytest.mark.defaultstatuses
     def test_update_to_ci(self, env, repo):
@@ -2352,7 +2336,7 @@ class TestPRUpdate:
         assert pr.state == 'validated'
 
     @pytest.mark.defaultstatuses
-    def test_update_missed(self, env, repo, config, users):
+    def test_update_missed(self, env, project, repo, config, users):
         """ Sometimes github's webhooks don't trigger properly, a branch's HEAD
         does not get updated and we might e.g. attempt to merge a PR despite it
         now being unreviewed or failing CI or somesuch.
@@ -2394,7 +2378,7 @@ class TestPRUpdate:
 
         other = env['runbot_merge.branch'].create({
             'name': 'somethingelse',
-            'project_id': env['runbot_merge.project'].search([]).id,
+            'project_id': project.id,
         })
 
         # we missed the update notification so the db should still be at c and
@@ -2624,8 +2608,8 @@ class TestBatching(object):
         pr = repo.make_pr(title='title {}'.format(prefix), body='body {}'.format(prefix),
                           target=target, head=prefix, token=user)
 
-        for context, result in statuses:
-            repo.post_status(c, result, context)
+        if statuses:
+            repo.post_statuses(c, *((result, context) for context, result in statuses))
         if reviewer:
             pr.post_comment(
                 'hansen r+%s' % (' rebase-merge' if len(trees) > 1 else ''),
@@ -2735,12 +2719,12 @@ class TestBatching(object):
                   node('initial')))
         assert staging == expected
 
-    def test_batching_pressing(self, env, repo, config):
+    def test_batching_pressing(self, env, project, repo, config):
         """ "Pressing" PRs should be selected before normal & batched together
         """
         # by limiting the batch size to 3 we allow both high-priority PRs, but
         # a single normal priority one
-        env['runbot_merge.project'].search([]).batch_limit = 3
+        project.batch_limit = 3
         with repo:
             m = repo.make_commit(None, 'initial', None, tree={'a': 'some content'})
             repo.make_ref('heads/master', m)
@@ -2875,8 +2859,7 @@ class TestBatching(object):
         # cause the PR to become ready the normal way
         with repo:
             pr01.post_comment("hansen r+", config['role_reviewer']['token'])
-            repo.post_status(p_01.head, 'success', 'legal/cla')
-            repo.post_status(p_01.head, 'success', 'ci/runbot')
+            repo.post_statuses(p_01.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
         env.run_crons()
 
         # a cancel_staging pr becoming ready should have cancelled the staging,
@@ -2911,8 +2894,7 @@ class TestBatching(object):
 
         # add CI failure
         with repo:
-            repo.post_status('heads/staging.master', 'failure', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('failure', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
 
         # should have staged the first half
@@ -3015,8 +2997,7 @@ class TestBatching(object):
         assert len(st.mapped('batch_ids.prs')) == 2
         # add CI failure
         with repo:
-            repo.post_status('heads/staging.master', 'failure', 'ci/runbot')
-            repo.post_status('heads/staging.master', 'success', 'legal/cla')
+            repo.post_statuses('heads/staging.master', ('failure', 'ci/runbot'), ('success', 'legal/cla'))
 
         pr1 = to_pr(env, pr1)
         pr2 = to_pr(env, pr2)
@@ -3028,21 +3009,18 @@ class TestBatching(object):
         assert len(st) == 1
         assert pr1.staging_id and pr1.staging_id == st
 
-        sp = env['runbot_merge.split'].search([])
-        assert len(sp) == 1
+        assert env['runbot_merge.split'].search_count([]) == 1
 
         # This is the failing PR!
         with repo:
-            repo.post_status('staging.master', 'failure', 'ci/runbot')
-            repo.post_status('staging.master', 'success', 'legal/cla')
+            repo.post_statuses('staging.master', ('failure', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons()
         assert pr1.state == 'error'
 
         assert pr2.staging_id
 
         with repo:
-            repo.post_status('staging.master', 'success', 'ci/runbot')
-            repo.post_status('staging.master', 'success', 'legal/cla')
+            repo.post_statuses('staging.master', ('success', 'ci/runbot'), ('success', 'legal/cla'))
         env.run_crons(None)
         assert pr2.state == 'merged'
 
@@ -3052,21 +3030,24 @@ class TestReviewing:
         attributes) taken in account
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+', config['role_other']['token'])
         env.run_crons()
 
-        assert to_pr(env, prx).state == 'validated'
+        pr_id = to_pr(env, prx)
+        assert pr_id.state == 'validated'
         with repo:
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert to_pr(env, prx).state == 'ready'
+        assert pr_id.state == 'ready'
         # second r+ to check warning
         with repo:
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
@@ -3091,8 +3072,7 @@ class TestReviewing:
             with repo.fork(token=reviewer) as f:
                 f.make_commits(m, Commit('first', tree={'m': 'c1'}), ref='heads/change')
             prx = repo.make_pr(title='title', body='body', target='master', head=f'{f.owner}:change', token=reviewer)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+', reviewer)
         env.run_crons()
 
@@ -3115,8 +3095,7 @@ class TestReviewing:
             with repo.fork(token=self_reviewer) as f:
                 f.make_commits(m, Commit('first', tree={'m': 'c1'}), ref='heads/change')
             prx = repo.make_pr(title='title', body='body', target='master', head=f'{f.owner}:change', token=self_reviewer)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen r+', self_reviewer)
         env.run_crons()
 
@@ -3133,14 +3112,16 @@ class TestReviewing:
             'email': users['user'] + '@example.org',
         })
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx.post_comment('hansen delegate+', config['role_reviewer']['token'])
             prx.post_comment('hansen r+', config['role_user']['token'])
         env.run_crons()
@@ -3153,19 +3134,21 @@ class TestReviewing:
         the PR or an other user without review rights
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             # flip case to check that github login is case-insensitive
             other = ''.join(c.lower() if c.isupper() else c.upper() for c in users['other'])
             prx.post_comment('hansen delegate=%s' % other, config['role_reviewer']['token'])
         env.run_crons()
-        env['res.partner'].search([('github_login', '=', other)]).email = f'{other}@example.org'
+        get_partner(env, other).email = f'{other}@example.org'
 
         with repo:
             # check this is ignored
@@ -3181,10 +3164,8 @@ class TestReviewing:
 
     def test_delegate_prefixes(self, env, repo, config):
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
-
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref='heads/master')
+            [c] = repo.make_commits(m, Commit('first', tree={'m': 'c'}))
             prx = repo.make_pr(title='title', body=None, target='master', head=c)
             prx.post_comment('hansen delegate=foo,@bar,#baz', config['role_reviewer']['token'])
 
@@ -3196,11 +3177,14 @@ class TestReviewing:
         """ treat github reviews as regular comments
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
         pr = to_pr(env, prx)
 
@@ -3243,7 +3227,7 @@ class TestReviewing:
             pr.post_comment('hansen r+', config['role_user']['token'])
         env.run_crons()
 
-        user_partner = env['res.partner'].search([('github_login', '=', users['user'])])
+        user_partner = get_partner(env, users['user'])
         assert user_partner.email is False
         assert pr.comments == [
             seen(env, pr, users),
@@ -3294,9 +3278,12 @@ class TestUnknownPR:
     """
     def test_rplus_unknown(self, repo, env, config, users):
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            m2 = repo.make_commit(m, 'second', None, tree={'m': 'm', 'm2': 'm2'})
-            repo.make_ref('heads/master', m2)
+            m, m2 = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('second', tree={'m2': 'm2'}),
+                ref='heads/master'
+            )
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
@@ -3317,15 +3304,14 @@ class TestUnknownPR:
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
 
         Fetch = env['runbot_merge.fetch_job']
-        fetches = Fetch.search([('repository', '=', repo.name), ('number', '=', prx.number)])
-        assert len(fetches) == 1, f"expected one fetch for {prx.number}, found {len(fetches)}"
+        fetches = Fetch.search_count([('repository', '=', repo.name), ('number', '=', prx.number)])
+        assert fetches == 1, f"expected one fetch for {prx.number}, found {fetches}"
 
-        env.run_crons('runbot_merge.fetch_prs_cron')
-        env.run_crons()
-        assert not Fetch.search([('repository', '=', repo.name), ('number', '=', prx.number)])
+        env.run_crons('runbot_merge.fetch_prs_cron', 'runbot_merge.check_linked_prs_status')
+        assert not Fetch.search_count([('repository', '=', repo.name), ('number', '=', prx.number)])
 
-        c = env['runbot_merge.commit'].search([('sha', '=', prx.head)])
-        assert json.loads(c.statuses) == {
+        [c] = env['runbot_merge.commit'].search_read([('sha', '=', prx.head)], ['statuses'])
+        assert json.loads(c['statuses']) == {
             'legal/cla': {'state': 'success', 'target_url': None, 'description': None, 'updated_at': matches("$$")},
             'ci/runbot': {'state': 'success', 'target_url': 'http://example.org/wheee', 'description': None, 'updated_at': matches("$$")}
         }
@@ -3372,12 +3358,11 @@ class TestUnknownPR:
             pr.post_comment('hansen r+', config['role_reviewer']['token'])
 
         Fetch = env['runbot_merge.fetch_job']
-        fetches = Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
-        assert len(fetches) == 1, f"expected one fetch for {pr.number}, found {len(fetches)}"
+        fetches = Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
+        assert fetches == 1, f"expected one fetch for {pr.number}, found {fetches}"
 
-        env.run_crons('runbot_merge.fetch_prs_cron')
-        env.run_crons()
-        assert not Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
+        env.run_crons('runbot_merge.fetch_prs_cron', 'runbot_merge.check_linked_prs_status')
+        assert not Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
 
         assert to_pr(env, pr).state == 'closed'
         assert pr.comments == [
@@ -3415,12 +3400,11 @@ class TestUnknownPR:
             pr.close()
 
         Fetch = env['runbot_merge.fetch_job']
-        fetches = Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
-        assert len(fetches) == 1, f"expected one fetch for {pr.number}, found {len(fetches)}"
+        fetches = Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
+        assert fetches == 1, f"expected one fetch for {pr.number}, found {fetches}"
 
-        env.run_crons('runbot_merge.fetch_prs_cron')
-        env.run_crons()
-        assert not Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
+        env.run_crons('runbot_merge.fetch_prs_cron', 'runbot_merge.check_linked_prs_status')
+        assert not Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
 
         assert to_pr(env, pr).state == 'closed'
         assert pr.comments == [seen(env, pr, users)]
@@ -3450,12 +3434,11 @@ class TestUnknownPR:
             pr.close()
 
         Fetch = env['runbot_merge.fetch_job']
-        fetches = Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
-        assert len(fetches) == 1, f"expected one fetch for {pr.number}, found {len(fetches)}"
+        fetches = Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
+        assert fetches == 1, f"expected one fetch for {pr.number}, found {fetches}"
 
-        env.run_crons('runbot_merge.fetch_prs_cron')
-        env.run_crons()
-        assert not Fetch.search([('repository', '=', repo.name), ('number', '=', pr.number)])
+        env.run_crons('runbot_merge.fetch_prs_cron', 'runbot_merge.check_linked_prs_status')
+        assert not Fetch.search_count([('repository', '=', repo.name), ('number', '=', pr.number)])
 
         assert to_pr(env, pr).state == 'closed'
         assert pr.comments == [seen(env, pr, users)]
@@ -3470,8 +3453,7 @@ class TestUnknownPR:
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             prx = repo.make_pr(title='title', body='body', target='branch', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
 
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons(
@@ -3494,8 +3476,7 @@ class TestUnknownPR:
 
             c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
             prx = repo.make_pr(title='title', body='body', target='branch', head=c1)
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
 
             prx.post_review('APPROVE', 'hansen r+', config['role_reviewer']['token'])
         env.run_crons(
@@ -3508,24 +3489,32 @@ class TestUnknownPR:
         ]
 
 class TestRecognizeCommands:
-    @pytest.mark.parametrize('botname', ['hansen', 'Hansen', 'HANSEN', 'HanSen', 'hAnSeN'])
-    def test_botname_casing(self, repo, env, botname, config):
+    def test_botname_casing(self, repo, env, config):
         """ Test that the botname is case-insensitive as people might write
         bot names capitalised or titlecased or uppercased or whatever
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
+            [m, c] = repo.make_commits(
+                None,
+                Commit('initial', tree={'m': 'm'}),
+                Commit('first', tree={'m': 'c'}),
+            )
             repo.make_ref('heads/master', m)
-
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
             prx = repo.make_pr(title='title', body=None, target='master', head=c)
 
         pr = to_pr(env, prx)
         assert pr.state == 'opened'
 
-        with repo:
-            prx.post_comment('%s r+' % botname, config['role_reviewer']['token'])
-        assert pr.state == 'approved'
+        # the casings are checked in sequence on the same PR, approving then
+        # unapproving it, as a test per casing would each need their own repo
+        for botname in ['hansen', 'Hansen', 'HANSEN', 'HanSen', 'hAnSeN']:
+            with repo:
+                prx.post_comment('%s r+' % botname, config['role_reviewer']['token'])
+            assert pr.state == 'approved', botname
+
+            with repo:
+                prx.post_comment('%s r-' % botname, config['role_reviewer']['token'])
+            assert pr.state == 'opened', botname
 
     @pytest.mark.parametrize('indent', ['', '\N{SPACE}', '\N{SPACE}'*4, '\N{TAB}'])
     def test_botname_indented(self, repo, env, indent, config):
@@ -3549,21 +3538,16 @@ class TestRecognizeCommands:
 
     def test_unknown_commands(self, repo, env, config, users):
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
+            [c] = repo.make_commits(m, Commit('first', tree={'m': 'c'}))
             pr = repo.make_pr(title='title', body=None, target='master', head=c)
             pr.post_comment("hansen do the thing", config['role_reviewer']['token'])
             pr.post_comment('hansen @bobby-b r+ :+1:', config['role_reviewer']['token'])
         env.run_crons()
 
-        assert pr.comments == [
-            (users['reviewer'], "hansen do the thing"),
-            (users['reviewer'], "hansen @bobby-b r+ :+1:"),
-            seen(env, pr, users),
-            (users['user'], """\
-@{reviewer} unknown command 'do'.
+        unknown = """\
+@{reviewer} unknown command '{command}'.
 
 For your own safety I've ignored *everything in your entire comment*.
 
@@ -3591,126 +3575,68 @@ Currently available commands:
 |`check`|fetches or refreshes PR metadata, resets mergebot state|
 
 Note: this help text is dynamic and will change with the state of the PR.
-""".format_map(users)),
-            (users['user'], """\
-@{reviewer} unknown command '@bobby-b'.
-
-For your own safety I've ignored *everything in your entire comment*.
-
-Currently available commands:
-
-|command||
-|-|-|
-|`help`|displays this help|
-|`r(eview)+`|approves the PR, if it's a forwardport also approves all non-detached parents|
-|`r(eview)=<number>`|only approves the specified parents|
-|`fw=no`|does not forward-port this PR|
-|`fw=default`|forward-ports this PR normally|
-|`fw=skipci`|does not wait for a forward-port's statuses to succeed before creating the next one|
-|`up to <branch>`|only ports this PR forward to the specified branch (included)|
-|`merge`|integrate the PR with a simple merge commit, using the PR description as message|
-|`rebase-merge`|rebases the PR on top of the target branch the integrates with a merge commit, using the PR description as message|
-|`rebase-ff`|rebases the PR on top of the target branch, then fast-forwards|
-|`squash`|squashes the PR as a single commit on the target branch, using the PR description as message|
-|`delegate+`|grants approval rights to the PR author|
-|`delegate=<...>`|grants approval rights on this PR to the specified github users|
-|`default`|stages the PR normally|
-|`priority`|tries to stage this PR first, then adds `default` PRs if the staging has room|
-|`alone`|stages this PR only with other PRs of the same priority|
-|`cancel=staging`|automatically cancels the current staging when this PR becomes ready|
-|`check`|fetches or refreshes PR metadata, resets mergebot state|
-
-Note: this help text is dynamic and will change with the state of the PR.
-""".format_map(users)),
+"""
+        assert pr.comments == [
+            (users['reviewer'], "hansen do the thing"),
+            (users['reviewer'], "hansen @bobby-b r+ :+1:"),
+            seen(env, pr, users),
+            (users['user'], unknown.format_map({**users, 'command': 'do'})),
+            (users['user'], unknown.format_map({**users, 'command': '@bobby-b'})),
         ]
 
 class TestRMinus:
-    def test_rminus_approved(self, repo, env, config):
-        """ approved -> r- -> opened
+    @pytest.mark.parametrize('validated', [False, True], ids=['approved', 'ready'])
+    def test_rminus(self, repo, env, config, validated):
+        """ approved -> r- -> opened, ready -> r- -> validated
         """
+        unreviewed, reviewed = ('validated', 'ready') if validated else ('opened', 'approved')
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
-
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
-            prx = repo.make_pr(title='title', body=None, target='master', head=c)
-
-        pr = to_pr(env, prx)
-        assert pr.state == 'opened'
-
-        with repo:
-            prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert pr.state == 'approved'
-
-        with repo:
-            prx.post_comment('hansen r-', config['role_user']['token'])
-        assert pr.state == 'opened'
-        with repo:
-            prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert pr.state == 'approved'
-
-        with repo:
-            prx.post_comment('hansen r-', config['role_other']['token'])
-        assert pr.state == 'approved'
-
-        with repo:
-            prx.post_comment('hansen r-', config['role_reviewer']['token'])
-        assert pr.state == 'opened'
-
-    def test_rminus_ready(self, repo, env, config):
-        """ ready -> r- -> validated
-        """
-        with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
+            [c] = repo.make_commits(m, Commit('first', tree={'m': 'c'}))
             prx = repo.make_pr(title='title', body=None, target='master', head=c)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
-        env.run_crons()
+            if validated:
+                repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
+        if validated:
+            env.run_crons()
 
         pr = to_pr(env, prx)
-        assert pr.state == 'validated'
+        assert pr.state == unreviewed
 
         with repo:
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert pr.state == 'ready'
+        assert pr.state == reviewed
 
         with repo:
             prx.post_comment('hansen r-', config['role_user']['token'])
-        assert pr.state == 'validated'
+        assert pr.state == unreviewed
         with repo:
             prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        assert pr.state == 'ready'
+        assert pr.state == reviewed
 
         with repo:
             prx.post_comment('hansen r-', config['role_other']['token'])
-        assert pr.state == 'ready'
+        assert pr.state == reviewed
 
         with repo:
             prx.post_comment('hansen r-', config['role_reviewer']['token'])
-        assert pr.state == 'validated'
+        assert pr.state == unreviewed
 
     def test_rminus_staged(self, repo, env, config):
         """ staged -> r- -> validated
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c = repo.make_commit(m, 'first', None, tree={'m': 'c'})
+            [c] = repo.make_commits(m, Commit('first', tree={'m': 'c'}))
             prx = repo.make_pr(title='title', body=None, target='master', head=c)
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            repo.post_status(prx.head, 'success', 'legal/cla')
+            repo.post_statuses(prx.head, ('success', 'ci/runbot'), ('success', 'legal/cla'))
+            prx.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
         pr = to_pr(env, prx)
 
         # if reviewer unreviews, cancel staging & unreview
-        with repo:
-            prx.post_comment('hansen r+', config['role_reviewer']['token'])
-        env.run_crons()
         st = pr.staging_id
         assert st
 
@@ -3750,27 +3676,21 @@ class TestRMinus:
         entirely.
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c = repo.make_commit(m, 'first', None, tree={'m': 'm', '1': '1'})
-            repo.make_ref('heads/p1', c)
+            repo.make_commits(m, Commit('first', tree={'m': 'm', '1': '1'}), ref='heads/p1')
             prx1 = repo.make_pr(title='t1', body='b1', target='master', head='p1')
-            repo.post_status(prx1.head, 'success', 'legal/cla')
-            repo.post_status(prx1.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx1.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx1.post_comment('hansen r+', config['role_reviewer']['token'])
 
-            c = repo.make_commit(m, 'first', None, tree={'m': 'm', '2': '2'})
-            repo.make_ref('heads/p2', c)
+            repo.make_commits(m, Commit('first', tree={'m': 'm', '2': '2'}), ref='heads/p2')
             prx2 = repo.make_pr(title='t2', body='b2', target='master', head='p2')
-            repo.post_status(prx2.head, 'success', 'legal/cla')
-            repo.post_status(prx2.head, 'success', 'ci/runbot')
+            repo.post_statuses(prx2.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
             prx2.post_comment('hansen r+', config['role_reviewer']['token'])
         env.run_crons()
 
-        pr1, pr2 = env['runbot_merge.pull_requests'].search([], order='number')
-        assert pr1.number == prx1.number
-        assert pr2.number == prx2.number
+        pr1 = to_pr(env, prx1)
+        pr2 = to_pr(env, prx2)
         assert pr1.staging_id == pr2.staging_id
         s0 = pr1.staging_id
 
@@ -3796,17 +3716,18 @@ class TestRMinus:
 class TestComments:
     def test_address_method(self, repo, env, config):
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
 
-            repo.post_status(prx.head, 'success', 'legal/cla')
-            repo.post_status(prx.head, 'success', 'ci/runbot')
-            prx.post_comment('hansen delegate=foo', config['role_reviewer']['token'])
-            prx.post_comment('@hansen delegate=bar', config['role_reviewer']['token'])
-            prx.post_comment('#hansen delegate=baz', config['role_reviewer']['token'])
+            repo.post_statuses(prx.head, ('success', 'legal/cla'), ('success', 'ci/runbot'))
+            prx.post_comment(
+                'hansen delegate=foo\n'
+                '@hansen delegate=bar\n'
+                '#hansen delegate=baz',
+                config['role_reviewer']['token'],
+            )
 
         pr = to_pr(env, prx)
 
@@ -3817,17 +3738,16 @@ class TestComments:
         """ Comments being deleted should be ignored
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
         pr = to_pr(env, prx)
 
         with repo:
             cid = prx.post_comment('hansen r+', config['role_reviewer']['token'])
             # unreview by pushing a new commit
-            repo.update_ref(prx.ref, repo.make_commit(c1, 'second', None, tree={'m': 'c2'}), force=True)
+            repo.make_commits(c1, Commit('second', tree={'m': 'c2'}), ref=prx.ref, make=False)
         assert pr.state == 'opened'
         with repo:
             prx.delete_comment(cid, config['role_reviewer']['token'])
@@ -3838,17 +3758,16 @@ class TestComments:
         """ Comments being edited should be ignored
         """
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
         pr = to_pr(env, prx)
 
         with repo:
             cid = prx.post_comment('hansen r+', config['role_reviewer']['token'])
             # unreview by pushing a new commit
-            repo.update_ref(prx.ref, repo.make_commit(c1, 'second', None, tree={'m': 'c2'}), force=True)
+            repo.make_commits(c1, Commit('second', tree={'m': 'c2'}), ref=prx.ref, make=False)
         assert pr.state == 'opened'
         with repo:
             prx.edit_comment(cid, 'hansen r+ edited', config['role_reviewer']['token'])
@@ -3881,27 +3800,26 @@ class TestFeedback:
                 repo.post_status(pr_id.head, 'failure', ctx, target_url=url)
             env.run_crons()
 
+        failed = "@{user} @{reviewer} '{{}}' failed on this reviewed PR.".format_map(users)
         assert pr.comments == [
             (users['reviewer'], 'hansen r+'),
             seen(env, pr, users),
-            (users['user'], "@{user} @{reviewer} 'ci/runbot' failed on this reviewed PR.".format_map(users)),
-            (users['user'], "@{user} @{reviewer} 'legal/cla' failed on this reviewed PR.".format_map(users)),
-            (users['user'], "@{user} @{reviewer} 'legal/cla' failed on this reviewed PR.".format_map(users)),
+            (users['user'], failed.format('ci/runbot')),
+            (users['user'], failed.format('legal/cla')),
+            (users['user'], failed.format('legal/cla')),
         ]
 
     def test_review_failed(self, repo, env, users, config):
         """r+-ing a PR with failed CI sends feedback"""
         with repo:
-            m = repo.make_commit(None, 'initial', None, tree={'m': 'm'})
-            repo.make_ref('heads/master', m)
+            [m] = repo.make_commits(None, Commit('initial', tree={'m': 'm'}), ref="heads/master")
 
-            c1 = repo.make_commit(m, 'first', None, tree={'m': 'c1'})
+            [c1] = repo.make_commits(m, Commit('first', tree={'m': 'c1'}))
             prx = repo.make_pr(title='title', body='body', target='master', head=c1)
-        pr = to_pr(env, prx)
-
-        with repo:
             repo.post_status(prx.head, 'failure', 'ci/runbot')
         env.run_crons()
+
+        pr = to_pr(env, prx)
         assert pr.state == 'opened'
 
         with repo:
@@ -3945,16 +3863,22 @@ def log_to_node(log):
     assert parents, "Didn't find %s in log" % missing
 
     # github doesn't necessarily log topologically maybe?
-    todo = list(reversed(log))
+    pending = {c['sha']: len(c['parents']) for c in log}
+    children = collections.defaultdict(list)
+    for c in log:
+        for p in c['parents']:
+            children[p['sha']].append(c)
+    todo = collections.deque(c for c in reversed(log) if not c['parents'])
     while todo:
-        c = todo.pop(0)
-        if all(p['sha'] in nodes for p in c['parents']):
-            nodes[c['sha']] = (c['commit']['message'], frozenset(
-                nodes[p['sha']]
-                for p in c['parents']
-            ))
-        else:
-            todo.append(c)
+        c = todo.popleft()
+        nodes[c['sha']] = (c['commit']['message'], frozenset(
+            nodes[p['sha']]
+            for p in c['parents']
+        ))
+        for child in children[c['sha']]:
+            pending[child['sha']] -= 1
+            if not pending[child['sha']]:
+                todo.append(child)
 
     return nodes[log[0]['sha']]
 
@@ -34,10 +34,9 @@ def test_close_single(env, repo):
 
     assert Batches.search_count([]) == 0
 
-def test_close_multiple(env, make_repo2):
+def test_close_multiple(env, make_repos):
     Batches = env['runbot_merge.batch']
-    repo1 = make_repo2('wheee')
-    repo2 = make_repo2('wheeee')
+    repo1, repo2 = make_repos('wheee', 'wheeee')
 
     with repo1:
         repo1.make_commits(None, Commit("a", tree={"a": "a"}), ref='heads/master')
@@ -81,7 +80,7 @@ def test_close_multiple(env, make_repo2):
     assert not batch_id.active
     assert Batches.search_count([]) == 0
 
-def test_inconsistent_target(env, project, make_repo2, users, page, config):
+def test_inconsistent_target(env, project, make_repos, users, page, config):
     """If a batch's PRs have inconsistent targets,
 
     - only open PRs should count
@@ -91,9 +90,7 @@ def test_inconsistent_target(env, project, make_repo2, users, page, config):
     """
     # region setup
     Batches = env['runbot_merge.batch']
-    repo1 = make_repo2('whe')
-    repo2 = make_repo2('whee')
-    repo3 = make_repo2('wheee')
+    repo1, repo2, repo3 = make_repos('whe', 'whee', 'wheee')
     project.write({'branch_ids': [(0, 0, {'name': 'other'})]})
 
     with repo1:
@@ -200,11 +197,10 @@ Inconsistent targets:
 
     assert env['runbot_merge.stagings'].search_count([])
 
-def test_reopen_pr_in_staged_batch(env, project, make_repo2, config):
+def test_reopen_pr_in_staged_batch(env, project, make_repos, config):
     """Reopening a closed PR from a staged batch should cancel the staging
     """
-    repo1 = make_repo2('a')
-    repo2 = make_repo2('b')
+    repo1, repo2 = make_repos('a', 'b')
 
     with repo1:
         [m1, _] = repo1.make_commits(
@@ -248,11 +244,10 @@ def test_reopen_pr_in_staged_batch(env, project, make_repo2, config):
     assert not batch_id.staging_ids.filtered(lambda s: s.active)
     assert batch_id.blocked
 
-def test_reopen_pr_in_merged_batch(env, project, make_repo2, config, users):
+def test_reopen_pr_in_merged_batch(env, project, make_repos, config, users):
     """If the batch is merged, the pr should just be re-closed with a message
     """
-    repo1 = make_repo2('a')
-    repo2 = make_repo2('b')
+    repo1, repo2 = make_repos('a', 'b')
 
     with repo1:
         [m1, _] = repo1.make_commits(
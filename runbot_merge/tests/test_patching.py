@@ -123,7 +123,7 @@ def test_apply_commit(env, project, repo, users):
         'commit': c,
     })
 
-    env.run_crons()
+    env.run_crons(None)
 
     HEAD = repo.commit('master')
     assert repo.read_tree(HEAD) == {
@@ -146,7 +146,7 @@ def test_commit_conflict(env, project, repo, users):
         'commit': c,
     })
 
-    env.run_crons()
+    env.run_crons(None)
 
     HEAD = repo.commit('master')
     assert repo.read_tree(HEAD) == {
@@ -180,7 +180,7 @@ def test_apply_udiff(env, project, repo, users):
         'patch': BASIC_UDIFF,
     })
 
-    env.run_crons()
+    env.run_crons(None)
 
     HEAD = repo.commit('master')
     assert repo.read_tree(HEAD) == {
@@ -212,7 +212,7 @@ def test_apply_format_patch(env, project, repo, users, patch):
         'patch': patch,
     })
 
-    env.run_crons()
+    env.run_crons(None)
 
     bot = env['res.users'].browse((1,))
     assert p.message_ids[::-1].mapped(lambda m: (
@@ -242,7 +242,7 @@ def test_patch_conflict(env, project, repo, users):
     with repo:
         repo.make_commits('master', Commit('cccombo breaker', tree={'b': '3'}), ref='heads/master', make=False)
 
-    env.run_crons()
+    env.run_crons(None)
 
     HEAD = repo.commit('master')
     assert HEAD.message == 'cccombo breaker'